@@ -3,14 +3,63 @@
 import base64
 import binascii
 import json
-import re
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List
-from uuid import uuid4
 
 import gradio as gr
 import httpx
+import orjson
+
+TRAILER_START = "<!-- session_info: "
+TRAILER_END = " -->"
+# Minimum seconds between re-renders of the streaming message.
+RENDER_INTERVAL = 0.05
+
+# (button label, preset) pairs for the preset picker.
+PRESET_BUTTONS = [
+    ("General", "GENERAL_BOT"),
+    ("Nervy", "NERVY_BOT"),
+    ("Avoi", "AVOI_BOT"),
+    ("Enthu", "ENTHU_BOT"),
+    ("Iso", "ISO_BOT"),
+]
+
+EMPTY_SKILL_SUMMARY = """\
+#### Skill Type
+Unknown
+
+#### Score
+N/A
+
+#### Reason
+N/A\
+"""
+
+# Shared across requests so keep-alive connections to the API server get reused.
+# Gradio runs every handler on the same event loop, so a module-level client is safe.
+# NOTE: HTTP/2 isn't an option: uvicorn only serves HTTP/1.1.
+client = httpx.AsyncClient(
+    base_url="http://localhost:3000",
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Close the shared client on shutdown, on the loop that owns its connections."""
+    yield
+    await client.aclose()
 
-hack_extract = re.compile(r"<!-- session_info: ([A-Za-z0-9+/=]+) -->")
+
+@lru_cache(maxsize=1024)
+def make_trailer(session_id: str, preset: str) -> str:
+    """Encode session_info into the trailer appended to assistant messages."""
+    session_info = {"session_id": session_id, "preset": preset}
+    session_info_b64 = base64.b64encode(orjson.dumps(session_info)).decode("utf-8")
+    return f"\n{TRAILER_START}{session_info_b64}{TRAILER_END}"
 
 
 async def chat(msg: str, hist: List[gr.MessageDict], user_id: str):
@@ -28,16 +77,21 @@ async def chat(msg: str, hist: List[gr.MessageDict], user_id: str):
     for obj in reversed(hist):
         if obj["role"] != "assistant":
             continue
-        if not isinstance(obj["content"], str):
+        content = obj["content"]
+        if not isinstance(content, str):
+            continue
+        # The trailer is always the last thing in the message, so scan from the end.
+        start = content.rfind(TRAILER_START)
+        if start == -1:
             continue
-        last_line = obj["content"].splitlines()[-1]
-        match = hack_extract.search(last_line)
-        if match is None:
+        start += len(TRAILER_START)
+        end = content.find(TRAILER_END, start)
+        if end == -1 or content[end + len(TRAILER_END) :].strip():
             continue
         try:
-            # Decode base64 JSON
-            encoded_info = match.group(1)
-            decoded_bytes = base64.b64decode(encoded_info)
+            # Decode base64 JSON; invalid base64 is rejected by validate=True.
+            encoded_info = content[start:end]
+            decoded_bytes = base64.b64decode(encoded_info, validate=True)
             session_info = json.loads(decoded_bytes.decode("utf-8"))
             session_id = session_info.get("session_id")
             if preset is not None:
@@ -49,32 +103,52 @@ async def chat(msg: str, hist: List[gr.MessageDict], user_id: str):
 
     if session_id is None:
         print("No session_id found in history, generating a new one.")
-        session_id = uuid4().hex
+        # Opaque 32 hex char id, same shape as uuid4().hex.
+        session_id = os.urandom(16).hex()
     print(f"Using session_id: {session_id}, user_id: {user_id}")
 
     preset = "GENERAL_BOT" if preset is None else preset
-    async with httpx.AsyncClient() as client:
-        async with client.stream(
-            "POST",
-            "http://localhost:3000/chat",
-            json={
-                "msg": msg,
-                "session_id": session_id,
-                "user_id": user_id,
-                "preset": preset,
-            },
-            timeout=None,
-        ) as res:
-            async for update in res.aiter_bytes():
-                out = update.decode("utf-8")
-                # Create session info JSON and encode as base64
-                session_info = {"session_id": session_id, "preset": preset}
-                session_info_json = json.dumps(session_info)
-                session_info_b64 = base64.b64encode(
-                    session_info_json.encode("utf-8")
-                ).decode("utf-8")
-                out += f"\n<!-- session_info: {session_info_b64} -->"
-                yield out
+
+    # session_info is invariant for the whole response, so encode it only once.
+    trailer = make_trailer(session_id, preset)
+
+    body = orjson.dumps(
+        {"msg": msg, "session_id": session_id, "user_id": user_id, "preset": preset}
+    )
+    async with client.stream(
+        "POST",
+        "/chat",
+        content=body,
+        headers={"Content-Type": "application/json"},
+        timeout=None,
+    ) as res:
+        # Errors (e.g. 422, 500) come back as a plain JSON body, not SSE events.
+        if res.status_code != 200:
+            detail = (await res.aread()).decode("utf-8", errors="replace")
+            raise gr.Error(f"API error {res.status_code}: {detail}")
+
+        # The server sends SSE events with the new text in each; only re-render at
+        # most every RENDER_INTERVAL. aiter_lines decodes incrementally, so multi-byte
+        # chars split across chunks are handled correctly.
+        text = ""
+        pending = False
+        last_render = 0.0
+        async for line in res.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[len("data: ") :]
+            if data == "[DONE]":
+                break
+            text += orjson.loads(data)["delta"]
+            pending = True
+            now = time.monotonic()
+            if now - last_render < RENDER_INTERVAL:
+                continue
+            last_render = now
+            yield text + trailer
+            pending = False
+        if pending:
+            yield text + trailer
 
 
 # Additional outputs and inputs have to be declared before gr.ChatInterface, which
@@ -97,6 +171,8 @@ demo = gr.ChatInterface(
 # I'll be iterating quite a bit still, so don't reset the state due to lost secret
 # when gradio app is restarted. State might still be lost if code is changed in
 # some ways.
+# NOTE: BrowserState encryption runs in the browser; the Python side passes values
+# through untouched, so there's no server-side crypto cost to avoid here.
 demo.saved_conversations.secret = "not-secret"
 
 
@@ -107,59 +183,42 @@ with demo:
         secret="not-secret",
     )
     with gr.Row():
-        btn_p1 = gr.Button("Use General")
-        btn_p1.click(
-            fn=lambda: "%PRESET%\tGENERAL_BOT",
-            inputs=[],
-            outputs=[demo.textbox],
-        )
-        btn_p2 = gr.Button("Use Nervy")
-        btn_p2.click(
-            fn=lambda: "%PRESET%\tNERVY_BOT",
-            inputs=[],
-            outputs=[demo.textbox],
-        )
-        btn_p3 = gr.Button("Use Avoi")
-        btn_p3.click(
-            fn=lambda: "%PRESET%\tAVOI_BOT",
-            inputs=[],
-            outputs=[demo.textbox],
-        )
-        btn_p4 = gr.Button("Use Enthu")
-        btn_p4.click(
-            fn=lambda: "%PRESET%\tENTHU_BOT",
-            inputs=[],
-            outputs=[demo.textbox],
-        )
-        btn_p5 = gr.Button("Use Iso")
-        btn_p5.click(
-            fn=lambda: "%PRESET%\tISO_BOT",
-            inputs=[],
-            outputs=[demo.textbox],
-        )
+        for label, preset in PRESET_BUTTONS:
+            gr.Button(f"Use {label}").click(
+                fn=lambda text=f"%PRESET%\t{preset}": text,
+                inputs=[],
+                outputs=[demo.textbox],
+            )
 
     with gr.Accordion(label="Skill Judgement", open=False):
         skill_summary_display = gr.Markdown(value="")
+        # (user_id, ETag) of the currently displayed history.
+        skill_etag_state = gr.State(("", ""))
         skill_timer = gr.Timer(value=1.0)  # Refresh every 10 seconds
 
-        async def refresh_skill_summary(user_id: str):
+        async def refresh_skill_summary(user_id: str, etag_info: tuple[str, str]):
             """Fetch and display the user's skill summary."""
             if not user_id:
-                return {"error": "User ID is required"}
+                return {"error": "User ID is required"}, ("", "")
 
+            # Let the backend answer 304 if nothing changed since the last poll.
+            etag_user, etag = etag_info
+            headers = {"If-None-Match": etag} if etag and etag_user == user_id else {}
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"http://localhost:3000/skills/{user_id}/history", timeout=1.0
-                    )
-                    if response.status_code == 200:
-                        data = response.json()
-                        latest = (
-                            data.get("evaluations", [])[-1]
-                            if data.get("evaluations")
-                            else {}
-                        )
-                        return f"""\
+                response = await client.get(
+                    f"/skills/{user_id}/history", headers=headers, timeout=1.0
+                )
+                if response.status_code == 304:
+                    return gr.skip(), gr.skip()
+                if response.status_code != 200:
+                    error = f"{{'error': 'API error: {response.status_code}'}}"
+                    return error, ("", "")
+                new_etag_info = (user_id, response.headers.get("ETag", ""))
+                evaluations = orjson.loads(response.content).get("evaluations")
+                if not evaluations:
+                    return EMPTY_SKILL_SUMMARY, new_etag_info
+                latest = evaluations[-1]
+                summary = f"""\
 #### Skill Type
 {latest.get("skill_type", "Unknown")}
 
@@ -169,15 +228,15 @@ with demo:
 #### Reason
 {latest.get("reason", "N/A")}\
 """
-                    else:
-                        return f"{{'error': 'API error: {response.status_code}'}}"
+                return summary, new_etag_info
             except Exception as e:
-                return f"{{'error': 'Failed to fetch skill summary: {str(e)}'}}"
+                error = f"{{'error': 'Failed to fetch skill summary: {str(e)}'}}"
+                return error, ("", "")
 
         skill_timer.tick(
             refresh_skill_summary,
-            inputs=[user_id_widget],
-            outputs=[skill_summary_display],
+            inputs=[user_id_widget, skill_etag_state],
+            outputs=[skill_summary_display, skill_etag_state],
         )
 
     @gr.on([user_id_widget.change], inputs=[user_id_widget], outputs=[user_id_store])
@@ -193,4 +252,4 @@ with demo:
 
 # NOTE: gradio chat.py breaks the chat interface after refresh for some reason.
 if __name__ == "__main__":
-    demo.launch(server_name="0.0.0.0")
+    demo.launch(server_name="0.0.0.0", app_kwargs={"lifespan": lifespan})
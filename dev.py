@@ -1,28 +1,60 @@
 """Development entrypoint."""
 
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from rich.logging import RichHandler
 
 
+class PassthroughQueueHandler(QueueHandler):
+    """QueueHandler that keeps exc_info intact so rich can still render tracebacks."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is; the listener runs in the same process."""
+        return record
+
+
+def setup_logging(rich_handler: RichHandler):
+    """Log to both the console (via rich) and dev.log.
+
+    Handlers are run by a background listener so console/file I/O doesn't block
+    the event loop.
+    """
+    file_handler = logging.FileHandler("dev.log", mode="a", encoding="utf-8")
+    file_handler.setFormatter(
+        logging.Formatter("[%(asctime)s] %(levelname)s %(name)s: %(message)s")
+    )
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, rich_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    logging.basicConfig(format="", handlers=[PassthroughQueueHandler(log_queue)])
+
+
 def create_debug_app():
-    """Workaround to use different logger for debug."""
+    """Workaround to use different logger for debug.
+
+    NOTE: uvicorn's reloader respawns the worker process on code changes, so this
+    factory (and the imports below) only ever run once per process.
+    """
     import contextlib
 
     import fastapi
     import starlette
     import uvicorn
 
-    rich_handler = RichHandler(
-        rich_tracebacks=True,
-        tracebacks_suppress=[fastapi, starlette, uvicorn, contextlib],
-    )
-    file_handler = logging.FileHandler("dev.log", mode="a", encoding="utf-8")
-    file_handler.setFormatter(
-        logging.Formatter("[%(asctime)s] %(levelname)s %(name)s: %(message)s")
+    setup_logging(
+        RichHandler(
+            rich_tracebacks=True,
+            tracebacks_suppress=[fastapi, starlette, uvicorn, contextlib],
+        )
     )
-
-    logging.basicConfig(format="", handlers=[rich_handler, file_handler])
     logging.getLogger("src").setLevel(logging.DEBUG)
 
     from src import create_app
@@ -33,13 +65,7 @@ def create_debug_app():
 if __name__ == "__main__":
     import uvicorn
 
-    rich_handler = RichHandler(rich_tracebacks=True)
-    file_handler = logging.FileHandler("dev.log", mode="a", encoding="utf-8")
-    file_handler.setFormatter(
-        logging.Formatter("[%(asctime)s] %(levelname)s %(name)s: %(message)s")
-    )
-
-    logging.basicConfig(format="", handlers=[rich_handler, file_handler])
+    setup_logging(RichHandler(rich_tracebacks=True))
 
     uvicorn.run(
         "dev:create_debug_app",
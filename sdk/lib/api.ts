@@ -103,6 +103,9 @@ export class Api {
 
       const reader = resp.body.getReader()
       const decoder = new TextDecoder()
+      // The server sends SSE events with only the new text; accumulate it.
+      let buffer = ''
+      let text = ''
 
       try {
         while (true) {
@@ -110,8 +113,20 @@ export class Api {
 
           if (done) break
 
-          const update = decoder.decode(value, { stream: true })
-          if (update) yield update
+          buffer += decoder.decode(value, { stream: true })
+          // Events are separated by a blank line, the last one may be incomplete.
+          const events = buffer.split('\n\n')
+          buffer = events.pop() ?? ''
+
+          let changed = false
+          for (const event of events) {
+            if (!event.startsWith('data: ')) continue
+            const data = event.slice('data: '.length)
+            if (data === '[DONE]') continue
+            text += (JSON.parse(data) as { delta: string }).delta
+            changed = true
+          }
+          if (changed) yield text
         }
       } finally {
         reader.releaseLock()
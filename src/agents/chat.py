@@ -1,17 +1,39 @@
 """Front-facing conversational agent."""
 
+import heapq
 import logging
+from functools import lru_cache
+from typing import Dict, Tuple
 
 from pydantic_ai import Agent, RunContext
 
-from src.agents.skill import create_skill_judge_agent
+from src.agents.skill import DEFAULT_JUDGE_WINDOW, create_skill_judge_agent
 from src.skills import evaluate_recent_conversation, get_user_skill_summary
 from src.structs import ChatDeps
 from src.user_study_logger import get_user_study_logger
+from src.utils import run_in_background
 
 log = logging.getLogger(__name__)
 
 
+# Prompt file used by each preset.
+PRESET_PROMPT_FILES = {
+    "GENERAL_BOT": "chat_generic.md",
+    "NERVY_BOT": "chat_nervy.md",
+    "AVOI_BOT": "chat_avoi.md",
+    "ENTHU_BOT": "chat_enthu.md",
+    "ISO_BOT": "chat_iso.md",
+}
+
+# Introduction the bot opens with when it starts the conversation.
+PRESET_INTROS = {
+    "NERVY_BOT": "Hey… thanks for choosing me. I totally get what it’s like to overthink every word. Wanna practice chatting with someone who won’t judge you at all? 😊 What kind of social situations make you feel nervous?",
+    "AVOI_BOT": "Hi there. I know small talk can feel… weird. You can talk to me like a colleague, or like a friend—no pressure. Want to start by telling me how your day’s been, casually?",
+    "ENTHU_BOT": "Hi! I’m all ears if you’ve got something cool to share—I love when people are passionate. Want to tell me about something you’re really into lately? Then I’ll help you figure out how to keep others interested too!",
+    "ISO_BOT": "Hey. You don’t have to be super social to want connection—I’m here for small steps. Maybe we could just talk about something simple. What’s something you enjoy doing alone?",
+}
+
+
 def create_chat_agent():
     """Create front-facing chat agent."""
     from src.agents.prompts import PROMPTS
@@ -22,60 +44,35 @@ def create_chat_agent():
         deps_type=ChatDeps,
     )
 
-    @agent.instructions
-    def instructions(ctx: RunContext[ChatDeps]) -> str:
-        """Instructions for the chat agent."""
-        preset = ctx.deps.preset
-        if preset == "GENERAL_BOT":
-            prompt = PROMPTS["chat_generic.md"]
-            assert prompt is not None, f"Prompt template not found for {prompt}."
-        elif preset == "NERVY_BOT":
-            prompt = PROMPTS["chat_nervy.md"]
-            assert prompt is not None, f"Prompt template not found for {prompt}."
-            if ctx.deps.is_first_message:
-                prompt += f"""
-
-Start the conversation with the following introduction:
-```
-Hey… thanks for choosing me. I totally get what it’s like to overthink every word. Wanna practice chatting with someone who won’t judge you at all? 😊 What kind of social situations make you feel nervous?
-```
-"""
-        elif preset == "AVOI_BOT":
-            prompt = PROMPTS["chat_avoi.md"]
-            assert prompt is not None, f"Prompt template not found for {prompt}."
-            if ctx.deps.is_first_message:
-                prompt += f"""
+    # Build every preset's instructions upfront: (normal, first message).
+    # NOTE: Static prefix, don't interpolate per-request values into these. Gemini
+    # implicitly caches repeated prompt prefixes, so the preset prompt must stay
+    # first and byte-identical across turns; the intro is only ever appended after.
+    preset_prompts: Dict[str, Tuple[str, str]] = {}
+    for preset, filename in PRESET_PROMPT_FILES.items():
+        prompt = PROMPTS.get(filename)
+        if prompt is None:
+            raise KeyError(f"Prompt template not found for {filename}.")
+        first_prompt = prompt
+        if preset in PRESET_INTROS:
+            first_prompt += f"""
 
 Start the conversation with the following introduction:
 ```
-Hi there. I know small talk can feel… weird. You can talk to me like a colleague, or like a friend—no pressure. Want to start by telling me how your day’s been, casually?
+{PRESET_INTROS[preset]}
 ```
 """
-        elif preset == "ENTHU_BOT":
-            prompt = PROMPTS["chat_enthu.md"]
-            assert prompt is not None, f"Prompt template not found for {prompt}."
-            if ctx.deps.is_first_message:
-                prompt += f"""
+        preset_prompts[preset] = (prompt, first_prompt)
 
-Start the conversation with the following introduction:
-```
-Hi! I’m all ears if you’ve got something cool to share—I love when people are passionate. Want to tell me about something you’re really into lately? Then I’ll help you figure out how to keep others interested too!
-```
-"""
-        elif preset == "ISO_BOT":
-            prompt = PROMPTS["chat_iso.md"]
-            assert prompt is not None, f"Prompt template not found for {prompt}."
-            if ctx.deps.is_first_message:
-                prompt += f"""
-
-Start the conversation with the following introduction:
-```
-Hey. You don’t have to be super social to want connection—I’m here for small steps. Maybe we could just talk about something simple. What’s something you enjoy doing alone?
-```
-"""
-        else:
+    @agent.instructions
+    def instructions(ctx: RunContext[ChatDeps]) -> str:
+        """Instructions for the chat agent."""
+        preset = ctx.deps.preset
+        prompts = preset_prompts.get(preset)
+        if prompts is None:
             raise ValueError(f"Unknown preset: {preset}")
-        return prompt
+        prompt, first_prompt = prompts
+        return first_prompt if ctx.deps.is_first_message else prompt
 
     skill_judge_agent = create_skill_judge_agent()
 
@@ -83,7 +80,7 @@ Hey. You don’t have to be super social to want connection—I’m here for sma
     @agent.tool(retries=2, require_parameter_descriptions=True)
     async def judge_conversation(
         ctx: RunContext[ChatDeps],
-        recent_messages: int = -1,
+        recent_messages: int = DEFAULT_JUDGE_WINDOW,
     ) -> str:
         """Evaluate recent conversation for social skill demonstration.
 
@@ -91,10 +88,10 @@ Hey. You don’t have to be super social to want connection—I’m here for sma
 
         Args:
             ctx (RunContext[ChatDeps]): The agent context containing database access and session info.
-            recent_messages (int): Number of recent messages to analyze (default: -1).
+            recent_messages (int): Number of recent messages to analyze (default: 20).
 
         Returns:
-            str: Confirmation message indicating the evaluation was performed.
+            str: Confirmation message indicating the evaluation was scheduled.
         """
         log.info(f"Agent called: judge_conversation(recent_messages={recent_messages})")
 
@@ -102,54 +99,53 @@ Hey. You don’t have to be super social to want connection—I’m here for sma
         session_id = ctx.deps.session_id
         user_id = ctx.deps.user_id
         study_logger = get_user_study_logger()
+        # Snapshot the history now; the run keeps appending to ctx.messages.
+        message_history = list(ctx.messages)
 
         # Log tool call
-        if study_logger:
-            study_logger.log_tool_call(
-                user_id,
-                session_id,
-                "judge_conversation",
-                recent_messages=recent_messages,
-            )
-
-        # Perform skill evaluation.
-        try:
-            skill_evaluation = await evaluate_recent_conversation(
-                skill_judge_agent=skill_judge_agent,
-                message_history=ctx.messages,
-                recent_messages=recent_messages,
-            )
-
-            # Explicitly store the evaluation if we have a valid skill type and score
-            if skill_evaluation.skill_type is not None:
-                await db.add_skill_evaluation(
-                    user_id=ctx.deps.user_id,
-                    session_id=session_id,
-                    judgement=skill_evaluation,
+        study_logger.log_tool_call(
+            user_id,
+            session_id,
+            "judge_conversation",
+            recent_messages=recent_messages,
+        )
+
+        async def judge():
+            """Perform skill evaluation & store it."""
+            try:
+                skill_evaluation = await evaluate_recent_conversation(
+                    skill_judge_agent=skill_judge_agent,
+                    message_history=message_history,
+                    recent_messages=recent_messages,
                 )
 
-                # Log skill judgement
-                if study_logger:
+                # Explicitly store the evaluation if we have a valid skill type and score
+                if skill_evaluation.skill_type is not None:
+                    await db.add_skill_evaluation(
+                        user_id=user_id,
+                        session_id=session_id,
+                        judgement=skill_evaluation,
+                    )
+
+                    # Log skill judgement
                     study_logger.log_skill_judgement(
                         user_id, session_id, skill_evaluation
                     )
 
-                log.info(
-                    f"Recorded skill evaluation for user {ctx.deps.user_id} in session {session_id}: {skill_evaluation.skill_type} = {skill_evaluation.score}"
-                )
-                return "Skill evaluation performed."
-            else:
-                log.info(f"Reason for no evaluation: {skill_evaluation.reason}")
-                return (
-                    f"Skill evaluation rejected for reason: {skill_evaluation.reason}"
-                )
-        except Exception as e:
-            log.error(f"Error in judge_conversation tool: {e}", exc_info=e)
-            if study_logger:
+                    log.info(
+                        f"Recorded skill evaluation for user {user_id} in session {session_id}: {skill_evaluation.skill_type} = {skill_evaluation.score}"
+                    )
+                else:
+                    log.info(f"Reason for no evaluation: {skill_evaluation.reason}")
+            except Exception as e:
+                log.error(f"Error in judge_conversation tool: {e}", exc_info=e)
                 study_logger.log_error(
                     user_id, session_id, f"Judge conversation error: {str(e)}"
                 )
-            return f"Error evaluating conversation."
+
+        # The judge round-trip doesn't affect the reply, so don't make the user wait.
+        run_in_background(judge())
+        return "Skill evaluation scheduled."
 
     # TODO: This was generated by Copilot, it isn't exactly what I want, but close enough to adapt later.
     # @agent.tool
@@ -160,8 +156,7 @@ Hey. You don’t have to be super social to want connection—I’m here for sma
         study_logger = get_user_study_logger()
 
         # Log tool call
-        if study_logger:
-            study_logger.log_tool_call(user_id, session_id, "get_user_progress")
+        study_logger.log_tool_call(user_id, session_id, "get_user_progress")
 
         try:
             progress = await get_user_skill_summary(ctx.deps)
@@ -171,35 +166,47 @@ Hey. You don’t have to be super social to want connection—I’m here for sma
             total_count = progress.total_skills
             in_progress_count = progress.skills_in_progress
 
-            summary = f"Progress Summary for this session:\n"
-            summary += f"- Mastered skills: {mastered_count}/{total_count}\n"
-            summary += f"- Skills in progress: {in_progress_count}\n"
+            lines = [
+                "Progress Summary for this session:",
+                f"- Mastered skills: {mastered_count}/{total_count}",
+                f"- Skills in progress: {in_progress_count}",
+            ]
 
             # Add details about top performing skills
             skill_details = progress.skill_details
-            top_skills = sorted(
-                [
+            top_skills = heapq.nlargest(
+                3,
+                (
                     (skill, details)
                     for skill, details in skill_details.items()
                     if details.total_evaluations > 0
-                ],
+                ),
                 key=lambda x: x[1].weighted_score,
-                reverse=True,
-            )[:3]
+            )
 
             if top_skills:
-                summary += "\nTop performing skills:\n"
+                lines.append("\nTop performing skills:")
                 for skill, details in top_skills:
-                    summary += f"- {skill}: {details.weighted_score:.2f} (mastered: {'yes' if details.is_mastered else 'no'})\n"
+                    lines.append(
+                        f"- {skill}: {details.weighted_score:.2f} (mastered: {'yes' if details.is_mastered else 'no'})"
+                    )
 
-            return summary
+            return "\n".join(lines) + "\n"
 
         except Exception as e:
             log.error(f"Error in get_user_progress tool: {e}", exc_info=e)
-            if study_logger:
-                study_logger.log_error(
-                    user_id, session_id, f"Get user progress error: {str(e)}"
-                )
+            study_logger.log_error(
+                user_id, session_id, f"Get user progress error: {str(e)}"
+            )
             return f"Unable to retrieve progress: {str(e)}"
 
     return agent
+
+
+@lru_cache(maxsize=1)
+def get_chat_agent():
+    """Get the shared front-facing chat agent.
+
+    Presets are resolved per run from the deps, so one agent serves every request.
+    """
+    return create_chat_agent()
@@ -1,25 +1,30 @@
 """Load prompts from Markdown in this directory."""
 
 import re
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 
 _base_dir = Path(__file__).parent
 
+# Matches <!-- ... --> comments (including multiline), including surrounding whitespace/newlines.
+_comment_re = re.compile(r"^[ \t]*<!--[\s\S]*?-->[ \t]*(?:\r?\n)?", re.MULTILINE)
+
+
+def _read_prompt(path: Path) -> Tuple[str, str]:
+    """Read a prompt file and strip its comments."""
+    content = _comment_re.sub("", path.read_text(encoding="utf-8"))
+    return path.name, content.strip()
+
+
 # TODO: The prompts used by each agent should be configurable per user, maybe
 # as a FastAPI/PydanticAI Depends based on toggles saved in localStorage.
-PROMPTS: Dict[str, str | None] = defaultdict(lambda: None)
-
-for _f in _base_dir.glob("*.md"):
-    if _f.is_file():
-        with _f.open(encoding="utf-8") as f:
-            content = f.read()
-            # Remove all <!-- ... --> comments (including multiline), including surrounding whitespace/newlines.
-            content = re.sub(
-                r"^[ \t]*<!--.*?-->[ \t]*(\r?\n)?",
-                "",
-                content,
-                flags=re.DOTALL | re.MULTILINE,
-            )
-            PROMPTS[_f.name] = content.strip()
+
+# Read the files concurrently, disk reads dominate import time as prompts grow.
+_files = [f for f in _base_dir.glob("*.md") if f.is_file()]
+with ThreadPoolExecutor(max_workers=8) as _ex:
+    _prompts: Dict[str, str] = dict(_ex.map(_read_prompt, _files))
+
+# Read-only view, look prompts up with PROMPTS.get(name).
+PROMPTS: Mapping[str, str] = MappingProxyType(_prompts)
@@ -1,35 +1,50 @@
 """Social skills evaluation agent."""
 
 import logging
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 from pydantic_ai import Agent, capture_run_messages
 
-from src.structs import ConversationMessage, SkillJudgement, SkillJudgementFull
-from src.utils import format_conversation
+from src.structs import (
+    ConversationMessage,
+    ConversationMessagesTypeAdapter,
+    SkillJudgement,
+    SkillJudgementFull,
+)
+from src.utils import format_message
 
 # Configuration constants
 MASTERY_THRESHOLD = 0.8
 RECENCY_ALPHA = 0.7  # Higher values give more weight to recent scores
 MIN_SCORES_FOR_MASTERY = 3  # Minimum number of scores needed before considering mastery
+DEFAULT_JUDGE_WINDOW = 20  # Number of recent messages the judge looks at by default
+
+# skill_type values the judge sometimes emits instead of null.
+_NULLISH_SKILL_TYPES = frozenset({"null", "none", "na", "nil", "n/a"})
 
 # Hardcoded social skills dictionary
-SOCIAL_SKILLS = {
-    "active_listening": "Shows understanding by paraphrasing, asking clarifying questions, or reflecting back what was heard.",
-    "assertiveness": "Expresses opinions, needs, or boundaries clearly and respectfully without being aggressive or passive.",
-    "empathy": "Demonstrates understanding and acknowledgment of another person's feelings and perspectives.",
-    "conversation_initiation": "Starts conversations naturally and appropriately in social contexts.",
-    "conflict_resolution": "Addresses disagreements or tensions constructively and seeks mutually beneficial solutions.",
-    "emotional_regulation": "Manages own emotions appropriately in social situations, staying calm under pressure.",
-    "social_awareness": "Reads social cues, understands group dynamics, and adapts behavior to social context.",
-    "encouragement": "Provides positive support, validation, or motivation to others.",
-    "boundary_setting": "Clearly communicates personal limits and respects others' boundaries.",
-    "small_talk": "Engages in light, casual conversation to build rapport and maintain social connections.",
-}
+SOCIAL_SKILLS: Mapping[str, str] = MappingProxyType(
+    {
+        "active_listening": "Shows understanding by paraphrasing, asking clarifying questions, or reflecting back what was heard.",
+        "assertiveness": "Expresses opinions, needs, or boundaries clearly and respectfully without being aggressive or passive.",
+        "empathy": "Demonstrates understanding and acknowledgment of another person's feelings and perspectives.",
+        "conversation_initiation": "Starts conversations naturally and appropriately in social contexts.",
+        "conflict_resolution": "Addresses disagreements or tensions constructively and seeks mutually beneficial solutions.",
+        "emotional_regulation": "Manages own emotions appropriately in social situations, staying calm under pressure.",
+        "social_awareness": "Reads social cues, understands group dynamics, and adapts behavior to social context.",
+        "encouragement": "Provides positive support, validation, or motivation to others.",
+        "boundary_setting": "Clearly communicates personal limits and respects others' boundaries.",
+        "small_talk": "Engages in light, casual conversation to build rapport and maintain social connections.",
+    }
+)
 
 log = logging.getLogger(__name__)
 
 
+# NOTE: The prompt & agent are static, so they are only built once per process.
+@lru_cache(maxsize=1)
 def create_skill_judge_agent() -> Agent[None, SkillJudgement]:
     """Create a skill evaluation agent in a closure, following chat.py pattern."""
     from src.agents.prompts import PROMPTS
@@ -41,10 +56,13 @@ def create_skill_judge_agent() -> Agent[None, SkillJudgement]:
     )
 
     # Load prompt template and format with skills list
-    prompt_template = PROMPTS["skill_generic.md"]
+    prompt_template = PROMPTS.get("skill_generic.md")
     if prompt_template is None:
-        raise ValueError("skill_generic.md prompt not found")
+        raise KeyError("skill_generic.md prompt not found")
 
+    # NOTE: Static prefix, don't interpolate per-request values into the instructions;
+    # they must stay byte-identical across calls to hit Gemini's implicit caching.
+    # The conversation goes in the user prompt instead.
     system_prompt = prompt_template.format(skills_list=skills_list)
 
     agent = Agent(
@@ -73,7 +91,11 @@ async def evaluate_conversation(
         SkillJudgementFull containing the evaluation results
     """
     # Format conversation for analysis
-    conversation_text = format_conversation(messages)
+    conversation_text = "\n".join(format_message(msg) for msg in messages)
+    # Stored as a JSON array, same as the messages table.
+    conversation_context = ConversationMessagesTypeAdapter.dump_json(messages).decode(
+        "utf-8"
+    )
 
     # Add user profile context if available
     profile_context = ""
@@ -92,20 +114,14 @@ Focus on the user's behavior and provide your evaluation."""
             result = await agent.run(prompt)
             output = result.output
             skill_type = output.skill_type
-            if skill_type is not None and skill_type.lower() in {
-                "null",
-                "none",
-                "na",
-                "nil",
-                "n/a",
-            }:
+            if skill_type and skill_type.lower() in _NULLISH_SKILL_TYPES:
                 skill_type = None
             wrapped = SkillJudgementFull(
                 skill_type=skill_type,
                 score=output.score,
                 reason=output.reason,
                 confidence=output.confidence,
-                conversation_context="\n".join(m.model_dump_json() for m in messages),
+                conversation_context=conversation_context,
             )
             return wrapped
 
@@ -5,24 +5,36 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import logging
+import os
 from contextlib import asynccontextmanager
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+import orjson
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic_ai import capture_run_messages
 
-from src.agents.chat import create_chat_agent
+from src.agents.chat import get_chat_agent
 from src.db import Database
 from src.skills import get_user_skill_summary
 from src.structs import ChatDeps, ChatRequest, ConversationMessage
-from src.user_study_logger import get_user_study_logger, init_user_study_logger
-from src.utils import convert_model_messages_to_conversation
+from src.user_study_logger import (
+    close_user_study_logger,
+    get_user_study_logger,
+    init_user_study_logger,
+)
+from src.utils import (
+    convert_model_messages_to_conversation,
+    run_in_background,
+    wait_background_tasks,
+)
 
 __all__ = ["create_app"]
 log = logging.getLogger(__name__)
 
+USER_STUDY_LOGGING_ENABLED = os.getenv("USER_STUDY_LOGGING", "true").lower() == "true"
+
 
 def create_app():
     """App factory.
@@ -34,14 +46,14 @@ def create_app():
     async def lifespan(app: FastAPI):
         """Put only heavy loading or cleanup tasks here."""
         # Initialize user study logging
-        import os
-
-        logging_enabled = os.getenv("USER_STUDY_LOGGING", "true").lower() == "true"
-        init_user_study_logger(enabled=logging_enabled)
+        init_user_study_logger(enabled=USER_STUDY_LOGGING_ENABLED)
 
         async with Database.connect("db.sqlite") as db:
             yield dict(db=db)
+            # Let pending skill evaluations etc finish while the DB is still open.
+            await wait_background_tasks()
         # cleanup tasks
+        close_user_study_logger()
 
     app = FastAPI(lifespan=lifespan)
 
@@ -54,7 +66,7 @@ def create_app():
         allow_headers=["*"],
     )
 
-    chat_agent = create_chat_agent()
+    chat_agent = get_chat_agent()
 
     async def get_db(request: Request) -> Database:
         return request.state.db
@@ -71,22 +83,18 @@ def create_app():
         # Get user study logger
         study_logger = get_user_study_logger()
 
-        await db.ensure_user(user_id)
-        await db.ensure_session(session_id, user_id)
+        await db.ensure_user_and_session(user_id, session_id)
+        hist = await db.get_messages(session_id)
 
         # Log session start for new sessions
-        if study_logger:
-            hist = await db.get_messages(session_id)
-            if not hist:  # New session
-                study_logger.log_session_start(user_id, session_id)
+        if not hist:  # New session
+            study_logger.log_session_start(user_id, session_id)
 
-            # Log user message
-            if is_bot_gen_req:
-                study_logger.log_session_event(user_id, session_id, f"Preset: {preset}")
-            else:
-                study_logger.log_user_message(user_id, session_id, msg or "")
-
-        hist = await db.get_messages(session_id)
+        # Log user message
+        if is_bot_gen_req:
+            study_logger.log_session_event(user_id, session_id, f"Preset: {preset}")
+        else:
+            study_logger.log_user_message(user_id, session_id, msg or "")
 
         # Create proper dependencies for the agent
         # TODO: Preset should be set once then persisted in the database, rather than
@@ -108,25 +116,44 @@ def create_app():
                     async def stream_text():
                         # delta=False since history tracking is done in the backend, and True
                         # breaks pydantic_ai's history tracking (and they wontfix it).
+                        # debounce_by coalesces model chunks arriving within 100ms into
+                        # one update, so each event carries a batch of tokens.
                         full_response = ""
-                        async for update in result.stream_text(delta=False):
+                        async for update in result.stream_text(
+                            delta=False, debounce_by=0.1
+                        ):
+                            # Only send what's new, the client accumulates it.
+                            delta = update[len(full_response) :]
                             full_response = update  # Keep the latest full response
-                            yield update
+                            yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
 
-                        # Log assistant response
-                        if study_logger and full_response:
+                        # Logged here rather than after the DB write, so it stays
+                        # ahead of the next turn's USER line in the study log.
+                        if full_response:
                             study_logger.log_assistant_message(
                                 user_id, session_id, full_response
                             )
-
-                        # Once done, save new messages to the database.
-                        await db.add_messages(session_id, result.new_messages())
-
-                    return StreamingResponse(stream_text(), media_type="text/plain")
+                        # Once done, save the turn. This is done in the background so
+                        # the response can close right away.
+                        run_in_background(
+                            db.add_messages(session_id, result.new_messages())
+                        )
+
+                        # Sent last, clients may disconnect as soon as they see it.
+                        yield "data: [DONE]\n\n"
+
+                    # SSE, since proxies tend to buffer text/plain responses whole.
+                    return StreamingResponse(
+                        stream_text(),
+                        media_type="text/event-stream",
+                        headers={
+                            "Cache-Control": "no-cache",
+                            "X-Accel-Buffering": "no",
+                        },
+                    )
             except Exception as e:
                 log.error(f"Messages: {dbg_msgs}", exc_info=e)
-                if study_logger:
-                    study_logger.log_error(user_id, session_id, f"Chat error: {str(e)}")
+                study_logger.log_error(user_id, session_id, f"Chat error: {str(e)}")
                 raise
 
     @app.get("/chat/{session_id}")
@@ -144,56 +171,59 @@ def create_app():
             )
             raise HTTPException(500, detail="Failed to retrieve chat history")
 
-    @app.get("/skills/{user_id}/summary")
+    # NOTE: The skill routes return ORJSONResponse directly, skipping FastAPI's
+    # jsonable_encoder & stdlib json.
+    @app.get("/skills/{user_id}/summary", response_class=ORJSONResponse)
     async def get_skill_progress(user_id: str, db: Database = Depends(get_db)):
         """Get skill development progress for a user."""
         try:
             deps = ChatDeps(db=db, user_id=user_id, session_id="", preset="")
             progress = await get_user_skill_summary(deps)
-            return progress
+            return ORJSONResponse(progress.model_dump())
         except Exception as e:
             log.error(f"Error retrieving skill progress for {user_id}: {e}", exc_info=e)
             raise HTTPException(500, detail="Failed to retrieve skill progress")
 
-    @app.get("/skills/{user_id}/history")
+    @app.get("/skills/{user_id}/history", response_class=ORJSONResponse)
     async def get_skill_history(
         user_id: str,
         skill_type: Optional[str] = None,
         session_id: Optional[str] = None,
+        if_none_match: Optional[str] = Header(None),
         db: Database = Depends(get_db),
     ):
-        """Get skill evaluation history for a user."""
-        try:
-            # Get all skill evaluations for the user (optionally filtered by session)
-            skill_history = await db.get_skill_history(user_id, session_id)
+        """Get skill evaluation history for a user.
 
-            # Filter by skill_type if specified
-            if skill_type:
-                skill_history = [
-                    evaluation
-                    for evaluation in skill_history
-                    if evaluation.skill_type == skill_type
-                ]
+        Supports `If-None-Match` so pollers can skip unchanged results.
+        """
+        try:
+            # Get all skill evaluations for the user (optionally filtered by session
+            # & skill_type)
+            skill_history = await db.get_skill_history(user_id, session_id, skill_type)
+
+            evaluations = [
+                evaluation._asdict()
+                for evaluation in skill_history
+                if evaluation.skill_type is not None
+            ]
+
+            # Evaluations are append-only, so the count & newest timestamp are
+            # enough to tell whether the result changed.
+            latest_ts = evaluations[-1]["timestamp"] if evaluations else ""
+            etag = f'"{len(evaluations)}-{latest_ts}"'
+            if if_none_match == etag:
+                return Response(status_code=304, headers={"ETag": etag})
 
             # Return flat list of evaluations
-            return {
-                "user_id": user_id,
-                "skill_type": skill_type,
-                "session_id": session_id,
-                "evaluations": [
-                    {
-                        "skill_type": evaluation.skill_type,
-                        "score": evaluation.score,
-                        "reason": evaluation.reason,
-                        "confidence": evaluation.confidence,
-                        "timestamp": evaluation.timestamp.isoformat()
-                        if evaluation.timestamp
-                        else None,
-                    }
-                    for evaluation in skill_history
-                    if evaluation.skill_type is not None
-                ],
-            }
+            return ORJSONResponse(
+                {
+                    "user_id": user_id,
+                    "skill_type": skill_type,
+                    "session_id": session_id,
+                    "evaluations": evaluations,
+                },
+                headers={"ETag": etag},
+            )
         except Exception as e:
             log.error(f"Error retrieving skill history for {user_id}: {e}", exc_info=e)
             raise HTTPException(
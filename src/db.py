@@ -1,159 +1,377 @@
 """Handles storing and retrieving chat history and skill tracking."""
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
-from datetime import datetime
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
 
 import aiosqlite
 from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
 
 if TYPE_CHECKING:
-    from src.structs import SkillJudgementFull
+    from src.structs import SkillJudgementFull, UserSkillSummary
 
 # TODO: Probably switch to SQLAlchemy when the expected worst case scenario occurs.
 # Actually key-document databases are better...
 
 log = logging.getLogger(__name__)
 
+# Max number of sessions whose parsed messages are kept in memory.
+MESSAGES_CACHE_SIZE = 256
+# Number of read-only connections, WAL lets them read while the writer writes.
+READER_POOL_SIZE = 8
+# Fetched message chunks larger than this (bytes) are parsed off the event loop.
+PARSE_IN_THREAD_BYTES = 256 * 1024
+# Max number of user & session ids each remembered as existing in the database.
+KNOWN_IDS_CACHE_SIZE = 10000
+
+# All DDL, run as a single script on connect.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    -- JSON bytes from ModelMessagesTypeAdapter.dump_json, parsed without decoding.
+    data BLOB NOT NULL,
+    FOREIGN KEY (session_id) REFERENCES sessions (id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session_id
+ON messages (session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_id
+ON sessions (user_id);
+
+-- Social skills tracking table.
+CREATE TABLE IF NOT EXISTS skill_evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    skill_type TEXT NOT NULL,
+    score REAL NOT NULL,
+    reason TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    conversation_context TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id),
+    FOREIGN KEY (session_id) REFERENCES sessions (id)
+);
+-- Covers get_skill_stats, so it never has to read the table itself.
+CREATE INDEX IF NOT EXISTS idx_skill_evaluations_user_skill_created_score
+ON skill_evaluations (user_id, skill_type, created_at, score);
+CREATE INDEX IF NOT EXISTS idx_skill_evaluations_session_skill
+ON skill_evaluations (session_id, skill_type);
+-- Let history reads return rows already ordered by created_at.
+CREATE INDEX IF NOT EXISTS idx_skill_evaluations_user_created
+ON skill_evaluations (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_skill_evaluations_user_session_created
+ON skill_evaluations (user_id, session_id, created_at);
+-- Nothing filters on created_at alone.
+DROP INDEX IF EXISTS idx_skill_evaluations_created_at;
+-- Superseded by idx_skill_evaluations_user_skill_created_score.
+DROP INDEX IF EXISTS idx_skill_evaluations_user_skill;
+"""
+
+# Queries, kept as constants so every call passes the same string & hits
+# sqlite3's per-connection statement cache.
+_Q_SESSION_EXISTS = """SELECT 1 FROM sessions WHERE id = ?"""
+_Q_ADD_SESSION = (
+    """INSERT INTO sessions (id, user_id) VALUES (?, ?) ON CONFLICT (id) DO NOTHING"""
+)
+_Q_USER_EXISTS = """SELECT 1 FROM users WHERE id = ?"""
+_Q_ADD_USER = """INSERT INTO users (id) VALUES (?) ON CONFLICT (id) DO NOTHING"""
+_Q_USER_AND_SESSION_EXIST = """SELECT (SELECT 1 FROM users WHERE id = ?), (SELECT 1 FROM sessions WHERE id = ?)"""
+_Q_GET_USER_SESSIONS = """SELECT id FROM sessions WHERE user_id = ?"""
+_Q_GET_MESSAGES = (
+    """SELECT id, data FROM messages WHERE session_id = ? AND id > ? ORDER BY id ASC"""
+)
+_Q_ADD_MESSAGES = """INSERT INTO messages (session_id, data) VALUES (?, ?)"""
+_Q_PREV_MESSAGE_ID = (
+    """SELECT coalesce(max(id), 0) FROM messages WHERE session_id = ? AND id < ?"""
+)
+_Q_ADD_SKILL_EVALUATION = """INSERT INTO skill_evaluations 
+   (user_id, session_id, skill_type, score, reason, confidence, conversation_context) 
+   VALUES (?, ?, ?, ?, ?, ?, ?)"""
+# created_at is returned as ISO 8601 text, same as datetime.isoformat().
+_Q_GET_SKILL_HISTORY = """SELECT skill_type, score, reason, confidence, replace(created_at, ' ', 'T') 
+   FROM skill_evaluations 
+   WHERE user_id = ?"""
+# Per skill weighted score, count & latest score. The recency fold
+# w = a*s + (1-a)*w_prev is unrolled into a sum, where the r-th most recent score
+# has weight a*(1-a)^(r-1), except the oldest (the seed) which has (1-a)^(n-1).
+_Q_GET_SKILL_STATS = """WITH ranked AS (
+     SELECT skill_type, score, 
+       ROW_NUMBER() OVER (PARTITION BY skill_type ORDER BY created_at DESC, id DESC) AS r, 
+       COUNT(*) OVER (PARTITION BY skill_type) AS n 
+     FROM skill_evaluations WHERE user_id = :user_id) 
+   SELECT skill_type, 
+     SUM(score * CASE WHEN r = n THEN pow(1 - :alpha, n - 1) 
+                      ELSE :alpha * pow(1 - :alpha, r - 1) END), 
+     n, 
+     MAX(CASE WHEN r = 1 THEN score END) 
+   FROM ranked GROUP BY skill_type"""
+
+
+async def _configure_connection(conn: aiosqlite.Connection):
+    """Apply per-connection PRAGMAs."""
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    await conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    await conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    await conn.execute("PRAGMA foreign_keys=ON")
+
+
+class SkillEvalRow(NamedTuple):
+    """Skill evaluation as loaded from the database, without pydantic validation."""
+
+    skill_type: Optional[str]
+    score: float
+    reason: str
+    confidence: float
+    timestamp: str  # ISO 8601
+
+
+class SkillStatsRow(NamedTuple):
+    """Aggregated scores of one skill type for a user."""
+
+    weighted_score: float
+    total_evaluations: int
+    latest_score: float
+
+
+def _remember(known: "OrderedDict[str, None]", key: str):
+    """Mark key as known to exist, evicting the least recently used key if full."""
+    known[key] = None
+    known.move_to_end(key)
+    if len(known) > KNOWN_IDS_CACHE_SIZE:
+        known.popitem(last=False)
+
+
+def _parse_chunks(chunks: List[bytes]) -> List[ModelMessage]:
+    """Parse stored message chunks, in order."""
+    messages = []
+    for chunk in chunks:
+        messages.extend(ModelMessagesTypeAdapter.validate_json(chunk))
+    return messages
+
 
-# TODO: caching if it turns out to be a bottleneck.
 class Database:
     """Database to manage chat sessions."""
 
-    def __init__(self, conn: aiosqlite.Connection):
-        """Initialize the database with a connection."""
+    def __init__(self, conn: aiosqlite.Connection, readers: List[aiosqlite.Connection]):
+        """Initialize the database with a write connection and read connections."""
+        # aiosqlite runs each connection on its own thread, so reads get a pool of
+        # connections instead of queueing behind writes on a single one.
         self.conn = conn
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        for reader in readers:
+            self._readers.put_nowait(reader)
+        # Write-through LRU cache of (max row id, parsed messages) per session, so
+        # each turn only parses chunks newer than what was already seen.
+        self._messages_cache: OrderedDict[str, Tuple[int, List[ModelMessage]]] = (
+            OrderedDict()
+        )
+        # Futures of the in-flight add_messages per session, done once committed.
+        self._pending_writes: Dict[str, Set[asyncio.Future[None]]] = {}
+        # LRU sets of ids known to exist. Rows are never deleted, so
+        # ensure_user_and_session can skip the database entirely for these.
+        self._known_users: OrderedDict[str, None] = OrderedDict()
+        self._known_sessions: OrderedDict[str, None] = OrderedDict()
+        # Skill summaries computed by src.skills, as user_id -> (expiry, summary) in
+        # LRU order, & the task computing each, shared by concurrent cache misses.
+        # Kept here so they never outlive or leak across databases.
+        self.skill_summary_cache: OrderedDict[str, Tuple[float, "UserSkillSummary"]] = (
+            OrderedDict()
+        )
+        self.skill_summary_tasks: Dict[str, "asyncio.Task[UserSkillSummary]"] = {}
 
     @classmethod
     @asynccontextmanager
     async def connect(cls, path: str | Path):
         """Connect to the database."""
-        async with aiosqlite.connect(path) as conn:
+        async with AsyncExitStack() as stack:
+            conn = await stack.enter_async_context(aiosqlite.connect(path))
+            # WAL lets reads run alongside writes, and with synchronous=NORMAL commits
+            # don't fsync (only checkpoints do).
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            await _configure_connection(conn)
+
             # Initialize the database schema as necessary.
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            """)
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY
-                )
-            """)
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    data TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES sessions (id)
-                )
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_messages_session_id
-                ON messages (session_id)
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sessions_user_id
-                ON sessions (user_id)
-            """)
-
-            # Social skills tracking table.
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS skill_evaluations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    session_id TEXT NOT NULL,
-                    skill_type TEXT NOT NULL,
-                    score REAL NOT NULL,
-                    reason TEXT NOT NULL,
-                    confidence REAL NOT NULL,
-                    conversation_context TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id),
-                    FOREIGN KEY (session_id) REFERENCES sessions (id)
-                )
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_skill_evaluations_user_skill
-                ON skill_evaluations (user_id, skill_type)
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_skill_evaluations_session_skill
-                ON skill_evaluations (session_id, skill_type)
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_skill_evaluations_created_at
-                ON skill_evaluations (created_at)
-            """)
-            await conn.commit()
+            await conn.executescript(_SCHEMA)
+
+            readers = []
+            for _ in range(READER_POOL_SIZE):
+                reader = await stack.enter_async_context(aiosqlite.connect(path))
+                await _configure_connection(reader)
+                await reader.execute("PRAGMA query_only=ON")
+                readers.append(reader)
 
-            yield cls(conn)
+            yield cls(conn, readers)
+
+    @asynccontextmanager
+    async def reader(self):
+        """Check out a read-only connection from the pool."""
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Get exclusive use of the write connection, so transactions don't mix."""
+        async with self._write_lock:
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.rollback()
+                raise
 
     # TODO: session_id by right should be allocated by server, not client.
+    # NOTE: The ensure_* methods check with a read first, since the rows usually
+    # exist. An INSERT that does nothing would still open a write transaction on
+    # the writer, which then has to be committed or rolled back.
     async def ensure_session(self, session_id: str, user_id: str):
         """Create a new session."""
-        conn = self.conn
-        # Check if session_id already exists.
-        cur = await conn.execute(
-            """SELECT 1 FROM sessions WHERE id = ?""", (session_id,)
-        )
-        if await cur.fetchone() is not None:
-            return  # Don't waste time to INSERT OR IGNORE then commit.
-
-        await conn.execute(
-            """INSERT INTO sessions (id, user_id) VALUES (?, ?)""",
-            (session_id, user_id),
-        )
-        await conn.commit()
+        async with self.reader() as conn:
+            # Check if session_id already exists.
+            cur = await conn.execute(_Q_SESSION_EXISTS, (session_id,))
+            if await cur.fetchone() is not None:
+                return
+
+        async with self.writer() as conn:
+            await conn.execute(_Q_ADD_SESSION, (session_id, user_id))
+            await conn.commit()
 
     async def ensure_user(self, user_id: str):
         """Create a new user if it doesn't exist."""
-        conn = self.conn
-        # Check if user_id already exists.
-        cur = await conn.execute("""SELECT 1 FROM users WHERE id = ?""", (user_id,))
-        if await cur.fetchone() is not None:
-            return  # Don't waste time to INSERT OR IGNORE then commit.
+        async with self.reader() as conn:
+            # Check if user_id already exists.
+            cur = await conn.execute(_Q_USER_EXISTS, (user_id,))
+            if await cur.fetchone() is not None:
+                return
+
+        async with self.writer() as conn:
+            await conn.execute(_Q_ADD_USER, (user_id,))
+            await conn.commit()
 
-        await conn.execute("""INSERT INTO users (id) VALUES (?)""", (user_id,))
-        await conn.commit()
+    async def ensure_user_and_session(self, user_id: str, session_id: str):
+        """Create the user and session if they don't exist, in one transaction."""
+        known_users, known_sessions = self._known_users, self._known_sessions
+        if user_id in known_users and session_id in known_sessions:
+            known_users.move_to_end(user_id)
+            known_sessions.move_to_end(session_id)
+            return
+
+        # Both usually exist already, so check with a single query first.
+        async with self.reader() as conn:
+            cur = await conn.execute(_Q_USER_AND_SESSION_EXIST, (user_id, session_id))
+            row = await cur.fetchone()
+
+        if row is None or row[0] is None or row[1] is None:
+            async with self.writer() as conn:
+                await conn.execute(_Q_ADD_USER, (user_id,))
+                await conn.execute(_Q_ADD_SESSION, (session_id, user_id))
+                await conn.commit()
+        _remember(known_users, user_id)
+        _remember(known_sessions, session_id)
 
     async def get_user_sessions(self, user_id: str) -> List[str]:
         """Get all session IDs for a user."""
-        conn = self.conn
-        cur = await conn.execute(
-            """SELECT id FROM sessions WHERE user_id = ?""",
-            (user_id,),
-        )
-        rows = await cur.fetchall()
+        async with self.reader() as conn:
+            cur = await conn.execute(_Q_GET_USER_SESSIONS, (user_id,))
+            rows = await cur.fetchall()
         return [row[0] for row in rows]
 
     # NOTE: The messages are saved & retrieved in chunks of several messages.
     async def get_messages(self, session_id: str) -> List[ModelMessage]:
         """Retrieve messages for a session."""
-        conn = self.conn
-        cur = await conn.execute(
-            """SELECT data FROM messages WHERE session_id = ? ORDER BY id ASC""",
-            (session_id,),
-        )
-        messages = []
-        rows = await cur.fetchall()
-        for row in rows:
-            messages.extend(ModelMessagesTypeAdapter.validate_json(row[0]))
-        return messages
+        cache = self._messages_cache
+        cached = cache.get(session_id)
+        pending = self._pending_writes.get(session_id)
+        if pending:
+            if cached is not None:
+                # The cache already has the messages being written, the DB might not.
+                cache.move_to_end(session_id)
+                return list(cached[1])
+            # Nothing cached holds the messages being written, so wait till they're
+            # committed, else e.g. the next turn would miss the previous one.
+            await asyncio.wait(set(pending))
+            cached = cache.get(session_id)
+
+        last_id, messages = (0, []) if cached is None else cached
+        # Only fetch chunks newer than the cached ones, which also picks up writes
+        # from other processes. On a hit this returns no rows & parses nothing.
+        async with self.reader() as conn:
+            cur = await conn.execute(_Q_GET_MESSAGES, (session_id, last_id))
+            rows = await cur.fetchall()
+        if rows:
+            chunks = [row[1] for row in rows]
+            # Cold loads of long sessions would otherwise stall every other request.
+            if sum(len(chunk) for chunk in chunks) > PARSE_IN_THREAD_BYTES:
+                new_messages = await asyncio.to_thread(_parse_chunks, chunks)
+            else:
+                new_messages = _parse_chunks(chunks)
+            messages = messages + new_messages
+            last_id = rows[-1][0]
+
+        # A write started meanwhile may have added its messages to the cache entry,
+        # don't replace it with this read which may lack them. Writes that already
+        # finished are fine, their rows come after last_id & get fetched next time.
+        if session_id not in self._pending_writes:
+            cache[session_id] = (last_id, messages)
+            cache.move_to_end(session_id)
+            if len(cache) > MESSAGES_CACHE_SIZE:
+                cache.popitem(last=False)
+        return list(messages)
 
     async def add_messages(self, session_id: str, messages: List[ModelMessage]):
         """Add messages to a session."""
-        conn = self.conn
+        # Update the cache first so reads see the messages even while the write
+        # is in flight. Reads without a cache entry wait on `done` instead.
+        cache = self._messages_cache
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending_writes.setdefault(session_id, set()).add(done)
+        if session_id in cache:
+            last_id, cached_messages = cache[session_id]
+            cache[session_id] = (last_id, cached_messages + messages)
+
         data = ModelMessagesTypeAdapter.dump_json(messages)
-        await conn.execute(
-            """INSERT INTO messages (session_id, data) VALUES (?, ?)""",
-            (session_id, data),
-        )
-        await conn.commit()
+        try:
+            async with self.writer() as conn:
+                cur = await conn.execute(_Q_ADD_MESSAGES, (session_id, data))
+                row_id = cur.lastrowid
+                # Still in the write transaction, so no other process can insert
+                # a chunk for this session in between.
+                cur = await conn.execute(_Q_PREV_MESSAGE_ID, (session_id, row_id))
+                (prev_id,) = await cur.fetchone()
+                await conn.commit()
+        except Exception:
+            cache.pop(session_id, None)
+            raise
+        else:
+            # The cached messages now include this chunk, so skip past its row id,
+            # but only if no other chunk (e.g. from another process) is in between.
+            if session_id in cache:
+                last_id, cached_messages = cache[session_id]
+                if last_id == prev_id:
+                    cache[session_id] = (row_id, cached_messages)
+                else:
+                    cache.pop(session_id)
+        finally:
+            done.set_result(None)
+            pending = self._pending_writes[session_id]
+            pending.discard(done)
+            if not pending:
+                del self._pending_writes[session_id]
 
     # Social skills tracking methods
     async def add_skill_evaluation(
@@ -163,87 +381,117 @@ class Database:
         judgement: "SkillJudgementFull",
     ):
         """Add a skill evaluation record."""
-        log.info(
-            f"Adding skill for user {user_id} in session {session_id}: {judgement.skill_type} = {judgement.score}"
-        )
-        log.info(judgement.model_dump_json())
+        await self.add_skill_evaluations(user_id, session_id, [judgement])
+
+    async def add_skill_evaluations(
+        self,
+        user_id: str,
+        session_id: str,
+        judgements: List["SkillJudgementFull"],
+    ):
+        """Add several skill evaluation records in one transaction."""
+        if not judgements:
+            return
 
         # Log to user study logger as well
         from src.user_study_logger import get_user_study_logger
 
         study_logger = get_user_study_logger()
-        if study_logger:
+        for judgement in judgements:
+            log.info(
+                f"Adding skill for user {user_id} in session {session_id}: {judgement.skill_type} = {judgement.score}"
+            )
+            log.info(judgement.model_dump_json())
             study_logger.log_session_event(
                 user_id,
                 session_id,
                 f"Skill evaluation saved to database: {judgement.skill_type}",
             )
 
-        conn = self.conn
-        await conn.execute(
-            """INSERT INTO skill_evaluations 
-               (user_id, session_id, skill_type, score, reason, confidence, conversation_context) 
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                user_id,
-                session_id,
-                judgement.skill_type,
-                judgement.score,
-                judgement.reason,
-                judgement.confidence,
-                judgement.conversation_context,
-            ),
-        )
-        await conn.commit()
+        async with self.writer() as conn:
+            await conn.executemany(
+                _Q_ADD_SKILL_EVALUATION,
+                [
+                    (
+                        user_id,
+                        session_id,
+                        judgement.skill_type,
+                        judgement.score,
+                        judgement.reason,
+                        judgement.confidence,
+                        judgement.conversation_context,
+                    )
+                    for judgement in judgements
+                ],
+            )
+            await conn.commit()
+
+        # Cached summaries for this user are stale now.
+        self.invalidate_skill_summary(user_id)
+
+    def invalidate_skill_summary(self, user_id: str):
+        """Drop the cached skill summary of a user, e.g. after a new evaluation."""
+        self.skill_summary_cache.pop(user_id, None)
+        # Any summary still being computed may be stale, don't let it be cached/shared.
+        self.skill_summary_tasks.pop(user_id, None)
 
     async def get_skill_history(
-        self, user_id: str, session_id: str | None = None
-    ) -> List["SkillJudgementFull"]:
+        self,
+        user_id: str,
+        session_id: str | None = None,
+        skill_type: str | None = None,
+    ) -> List[SkillEvalRow]:
         """Get skill evaluation history for a user, optionally filtered by session.
 
+        conversation_context isn't loaded, since nothing reads it back. timestamp is
+        left as the ISO 8601 string, since callers only sort or serialize it. Rows
+        are plain tuples, as they're usually just serialized again.
+
         Args:
             user_id: The user ID to get history for
             session_id: Optional session ID to filter by
+            skill_type: Optional skill type to filter by
 
         Returns:
-            List of SkillJudgementFull objects ordered by creation time
+            List of SkillEvalRow ordered by creation time
         """
-        from src.structs import SkillJudgementFull
+        query = _Q_GET_SKILL_HISTORY
+        params: Tuple[str, ...] = (user_id,)
+        if session_id:
+            query += " AND session_id = ?"
+            params += (session_id,)
+        if skill_type:
+            query += " AND skill_type = ?"
+            params += (skill_type,)
+        query += " ORDER BY created_at ASC"
 
-        conn = self.conn
+        async with self.reader() as conn:
+            cur = await conn.execute(query, params)
+            rows = await cur.fetchall()
 
-        if session_id:
-            query = """SELECT skill_type, score, reason, confidence, conversation_context, created_at 
-                       FROM skill_evaluations 
-                       WHERE user_id = ? AND session_id = ? 
-                       ORDER BY created_at ASC"""
-            params = (user_id, session_id)
-        else:
-            query = """SELECT skill_type, score, reason, confidence, conversation_context, created_at 
-                       FROM skill_evaluations 
-                       WHERE user_id = ? 
-                       ORDER BY created_at ASC"""
-            params = (user_id,)
-
-        cur = await conn.execute(query, params)
-        rows = await cur.fetchall()
-
-        result = []
-        for row in rows:
-            skill_type, score, reason, confidence, conversation_context, created_at = (
-                row
-            )
+        return [SkillEvalRow._make(row) for row in rows]
+
+    async def get_skill_stats(
+        self, user_id: str, alpha: float
+    ) -> Dict[str, SkillStatsRow]:
+        """Get a user's weighted recency score per skill type, computed by SQLite.
 
-            judgement = SkillJudgementFull(
-                skill_type=skill_type,
-                score=score,
-                reason=reason,
-                confidence=confidence,
-                conversation_context=conversation_context,
-                timestamp=datetime.fromisoformat(created_at),
+        The weighted score is the recency fold w = alpha*s + (1-alpha)*w_prev over the
+        scores oldest first, so only one row per skill crosses into Python.
+
+        Args:
+            user_id: The user ID to get stats for
+            alpha: Weight given to each more recent score
+
+        Returns:
+            Dict of skill type to SkillStatsRow
+        """
+        async with self.reader() as conn:
+            cur = await conn.execute(
+                _Q_GET_SKILL_STATS, {"user_id": user_id, "alpha": alpha}
             )
-            result.append(judgement)
+            rows = await cur.fetchall()
 
-        return result
+        return {row[0]: SkillStatsRow._make(row[1:]) for row in rows}
 
     # END OF EVALUATION.
@@ -2,8 +2,9 @@
 # Man this is the most AI generated file, but I don't know anything about how one
 # would define mastery of social skills anyways.
 
+import asyncio
 import logging
-from datetime import datetime
+import time
 from typing import List
 
 from pydantic_ai import Agent
@@ -16,6 +17,7 @@ from src.agents.skill import (
     SOCIAL_SKILLS,
     evaluate_conversation,
 )
+from src.db import Database
 from src.structs import (
     ChatDeps,
     SkillJudgement,
@@ -27,116 +29,16 @@ from src.utils import convert_model_messages_to_conversation
 
 log = logging.getLogger(__name__)
 
+SKILL_SUMMARY_TTL = 30.0  # Seconds a cached skill summary stays valid
+SKILL_SUMMARY_CACHE_SIZE = 1024  # Max number of users with a cached skill summary
 
-def calculate_weighted_score(
-    scores: List[tuple[float, datetime]], alpha: float = RECENCY_ALPHA
-) -> float:
-    """Calculate weighted recency score from a list of (score, timestamp) tuples.
 
-    The timestamp is only used to order the scores, not for time decay.
-    """
-    if not scores:
-        return 0.0
-
-    # Sort by timestamp (oldest first)
-    sorted_scores = sorted(scores, key=lambda x: x[1])
-
-    # Calculate weighted average using exponential decay
-    weighted_score = sorted_scores[0][0]  # Start with first score
-
-    for score, _ in sorted_scores[1:]:
-        weighted_score = alpha * score + (1 - alpha) * weighted_score
-
-    return weighted_score
-
-
-def calculate_time_weighted_score(
-    scores: List[tuple[float, datetime]],
-    time_decay_days: float = 30.0,
-    min_weight: float = 0.1,
-) -> float:
-    """Calculate time-weighted score that factors in time deltas between evaluations.
-
-    This version gives more weight to recent scores based on how much time has passed
-    since each evaluation, with exponential decay over time.
-
-    Args:
-        scores: List of (score, timestamp) tuples
-        time_decay_days: Number of days for weight to decay to ~37% (1/e)
-        min_weight: Minimum weight to assign to very old scores
-
-    Returns:
-        Time-weighted average score
-    """
-    if not scores:
-        return 0.0
-
-    if len(scores) == 1:
-        return scores[0][0]
-
-    # Sort by timestamp (oldest first)
-    sorted_scores = sorted(scores, key=lambda x: x[1])
-
-    # Use the most recent timestamp as reference point
-    latest_time = sorted_scores[-1][1]
-
-    # Calculate time-based weights and weighted sum
-    weighted_sum = 0.0
-    total_weight = 0.0
-
-    for score, timestamp in sorted_scores:
-        # Calculate days since this score relative to the latest score
-        days_ago = (latest_time - timestamp).total_seconds() / (24 * 3600)
-
-        # Exponential decay: weight = e^(-days_ago / time_decay_days)
-        # This gives full weight (1.0) to the latest score and decays older ones
-        import math
-
-        weight = max(min_weight, math.exp(-days_ago / time_decay_days))
-
-        weighted_sum += score * weight
-        total_weight += weight
-
-    return weighted_sum / total_weight if total_weight > 0 else 0.0
-
-
-def is_skill_mastered(
-    scores: List[tuple[float, datetime]], threshold: float = MASTERY_THRESHOLD
-) -> bool:
-    """Determine if a skill is mastered based on weighted recency scoring."""
-    if len(scores) < MIN_SCORES_FOR_MASTERY:
-        return False
-
-    weighted_score = calculate_weighted_score(scores)
-    return weighted_score >= threshold
-
-
-def is_skill_mastered_time_aware(
-    scores: List[tuple[float, datetime]],
-    threshold: float = MASTERY_THRESHOLD,
-    use_time_weighting: bool = True,
-    time_decay_days: float = 30.0,
-) -> bool:
-    """Determine if a skill is mastered using time-aware weighted scoring.
-
-    Args:
-        scores: List of (score, timestamp) tuples
-        threshold: Minimum weighted score required for mastery
-        use_time_weighting: Whether to use time-based weighting or simple recency weighting
-        time_decay_days: Number of days for time weight decay (only used if use_time_weighting=True)
-
-    Returns:
-        True if the skill is considered mastered
-    """
-    if len(scores) < MIN_SCORES_FOR_MASTERY:
-        return False
-
-    if use_time_weighting:
-        weighted_score = calculate_time_weighted_score(scores, time_decay_days)
-    else:
-        weighted_score = calculate_weighted_score(scores)
-
-    return weighted_score >= threshold
+def is_mastered(total_evaluations: int, weighted_score: float) -> bool:
+    """Whether a skill with this many scores & weighted recency score is mastered."""
+    return (
+        total_evaluations >= MIN_SCORES_FOR_MASTERY
+        and weighted_score >= MASTERY_THRESHOLD
+    )
 
 
 async def evaluate_recent_conversation(
@@ -185,22 +87,35 @@ async def evaluate_recent_conversation(
 
 
 async def get_user_skill_summary(deps: ChatDeps) -> UserSkillSummary:
-    """Get a summary of the user's skill development progress."""
-    db = deps.db
-    user_id = deps.user_id
-
-    # Get all skill evaluations for this user
-    skill_history = await db.get_skill_history(user_id)
-
-    # Group evaluations by skill type
-    scores_by_skill = {}
-    for evaluation in skill_history:
-        if evaluation.skill_type is not None:  # Skip evaluations with no skill type
-            if evaluation.skill_type not in scores_by_skill:
-                scores_by_skill[evaluation.skill_type] = []
-            scores_by_skill[evaluation.skill_type].append(
-                (evaluation.score, evaluation.timestamp)
-            )
+    """Get a summary of the user's skill development progress.
+
+    Summaries are cached per user on the database for SKILL_SUMMARY_TTL seconds,
+    or until Database.invalidate_skill_summary is called. Concurrent cache misses
+    for the same user share a single computation.
+    """
+    db, user_id = deps.db, deps.user_id
+    cache, tasks = db.skill_summary_cache, db.skill_summary_tasks
+
+    cached = cache.get(user_id)
+    if cached is not None and cached[0] > time.monotonic():
+        cache.move_to_end(user_id)
+        return cached[1]
+
+    task = tasks.get(user_id)
+    if task is None:
+        task = asyncio.create_task(_compute_user_skill_summary(db, user_id))
+        tasks[user_id] = task
+        task.add_done_callback(
+            lambda t: tasks.pop(user_id, None) if tasks.get(user_id) is t else None
+        )
+    # Shielded so one cancelled caller doesn't cancel it for the others.
+    return await asyncio.shield(task)
+
+
+async def _compute_user_skill_summary(db: Database, user_id: str) -> UserSkillSummary:
+    """Compute the skill summary of a user & cache it unless invalidated meanwhile."""
+    # Weighted recency scores are folded by SQLite, see _Q_GET_SKILL_STATS.
+    stats_by_skill = await db.get_skill_stats(user_id, RECENCY_ALPHA)
 
     # Calculate mastery status using business logic
     skill_details = {}
@@ -208,21 +123,20 @@ async def get_user_skill_summary(deps: ChatDeps) -> UserSkillSummary:
     in_progress_count = 0
 
     for skill_type in SOCIAL_SKILLS:
-        scores = scores_by_skill.get(skill_type, [])
-        if scores:
-            weighted_score = calculate_weighted_score(scores)
-            is_mastered = is_skill_mastered(scores)
+        stats = stats_by_skill.get(skill_type)
+        if stats is not None:
+            mastered = is_mastered(stats.total_evaluations, stats.weighted_score)
 
             skill_details[skill_type] = SkillStatus(
-                weighted_score=weighted_score,
-                is_mastered=is_mastered,
-                total_evaluations=len(scores),
-                latest_score=scores[-1][0] if scores else None,
+                weighted_score=stats.weighted_score,
+                is_mastered=mastered,
+                total_evaluations=stats.total_evaluations,
+                latest_score=stats.latest_score,
             )
 
-            if is_mastered:
+            if mastered:
                 mastered_count += 1
-            elif len(scores) > 0:
+            else:
                 in_progress_count += 1
         else:
             skill_details[skill_type] = SkillStatus(
@@ -239,4 +153,11 @@ async def get_user_skill_summary(deps: ChatDeps) -> UserSkillSummary:
         skill_details=skill_details,
     )
 
+    if db.skill_summary_tasks.get(user_id) is asyncio.current_task():
+        cache = db.skill_summary_cache
+        cache[user_id] = (time.monotonic() + SKILL_SUMMARY_TTL, summary)
+        cache.move_to_end(user_id)
+        if len(cache) > SKILL_SUMMARY_CACHE_SIZE:
+            cache.popitem(last=False)
+
     return summary
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from src.db import Database
 
@@ -39,7 +39,7 @@ class UserSkillSummary(BaseModel):
 
 
 # TODO: Make some of these optional to avoid the jank placeholder values elsewhere.
-@dataclass
+@dataclass(slots=True)
 class ChatDeps:
     """Dependencies for the chat agent."""
 
@@ -85,9 +85,16 @@ class SkillJudgementFull(SkillJudgement):
     timestamp: Optional[datetime] = None
 
 
-class ConversationMessage(BaseModel):
+# NOTE: A plain dataclass, since these are built per message part from already typed
+# values; pydantic still validates/serializes it at the API boundary.
+@dataclass(slots=True)
+class ConversationMessage:
     """Simplified message structure for skill evaluation."""
 
     role: Literal["system", "user", "assistant"]
     content: str
     timestamp: Optional[datetime] = None
+
+
+# Serializes whole conversations in one call, like pydantic-ai's ModelMessagesTypeAdapter.
+ConversationMessagesTypeAdapter = TypeAdapter(List[ConversationMessage])
@@ -1,30 +1,139 @@
 """User study logging for psychological analysis of conversations."""
 
 import logging
+import queue
 import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Set, Tuple
 
 from src.structs import SkillJudgementFull
 
+# Max number of session loggers kept, each holding its log file open.
+MAX_SESSION_LOGGERS = 256
+
 
 def utc8_converter(*args):
     """Convert timestamp to UTC+8 timezone."""
     return time.gmtime(time.mktime(time.localtime()) + 8 * 3600)
 
 
+# Human-readable formatter shared by all session log files.
+_SESSION_LOG_FORMATTER = logging.Formatter(
+    "[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+_SESSION_LOG_FORMATTER.converter = utc8_converter  # Set to UTC+8
+
+
+class _BatchedFileHandler(logging.FileHandler):
+    """FileHandler that only flushes when asked, so bursts are written together."""
+
+    def flush(self):
+        """Leave the records buffered, see flush_buffer."""
+
+    def flush_buffer(self):
+        """Write out the buffered records."""
+        super().flush()
+
+
+class _SessionQueueHandler(QueueHandler):
+    """Enqueue records along with the file handler of their session."""
+
+    def __init__(
+        self,
+        record_queue: "queue.SimpleQueue[logging.LogRecord]",
+        file_handler: _BatchedFileHandler,
+    ):
+        """Initialize with the shared queue and the session's file handler."""
+        super().__init__(record_queue)
+        self.file_handler = file_handler
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Attach the session's file handler to the record.
+
+        Unlike QueueHandler, the message isn't formatted here but by the writer
+        thread. Records never leave the process & are only logged with immutable
+        args, so this is safe.
+        """
+        record.file_handler = self.file_handler
+        return record
+
+
+class _SessionFileDispatcher(logging.Handler):
+    """Write each record with the file handler it was enqueued with."""
+
+    def __init__(self):
+        """Initialize with no buffered files."""
+        super().__init__()
+        self._dirty: Set[_BatchedFileHandler] = set()
+
+    def emit(self, record: logging.LogRecord):
+        """Write the record to its session's log file, or close the file."""
+        file_handler = record.file_handler
+        if getattr(record, "close_file", False):
+            self._dirty.discard(file_handler)
+            file_handler.close()
+        else:
+            file_handler.handle(record)
+            self._dirty.add(file_handler)
+
+    def flush(self):
+        """Write out every file with buffered records."""
+        for file_handler in self._dirty:
+            file_handler.flush_buffer()
+        self._dirty.clear()
+
+
+class _SessionQueueListener(QueueListener):
+    """QueueListener that flushes the log files whenever the queue runs dry."""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        """Flush before waiting on an empty queue, so records are never held back."""
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return super().dequeue(block)
+
+
 class UserStudyLogger:
     """Logger for user study conversations focused on psychological analysis."""
 
-    def __init__(self, base_dir: str = "data"):
+    def __init__(self, base_dir: str = "data", max_sessions: int = MAX_SESSION_LOGGERS):
         """Initialize the user study logger.
 
         Args:
             base_dir: Base directory for storing user logs
+            max_sessions: Max number of session loggers (and open log files) kept
         """
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(exist_ok=True)
-        self._loggers = {}  # Cache for session loggers
+        self.max_sessions = max_sessions
+        # LRU cache for session loggers
+        self._loggers: OrderedDict[Tuple[str, str], logging.Logger] = OrderedDict()
+        # Session loggers only enqueue records; a background thread writes them to
+        # the log files, so file I/O stays off the event loop.
+        self._queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._listener = _SessionQueueListener(self._queue, _SessionFileDispatcher())
+        self._listener.start()
+
+    def close(self):
+        """Flush pending records and close all log files."""
+        while self._loggers:
+            self._drop_logger(self._loggers.popitem(last=False)[1])
+        # Drains the queue, including the close of each file, before returning.
+        self._listener.stop()
+
+    def _drop_logger(self, logger: logging.Logger):
+        """Detach a session logger & close its log file after pending records."""
+        queue_handler = logger.handlers[0]
+        logger.removeHandler(queue_handler)
+        # Queued behind the session's records, so those still get written first.
+        self._queue.put(
+            logging.makeLogRecord(
+                {"file_handler": queue_handler.file_handler, "close_file": True}
+            )
+        )
 
     def _get_session_logger(self, user_id: str, session_id: str) -> logging.Logger:
         """Get or create a logger for a specific session.
@@ -36,10 +145,12 @@ class UserStudyLogger:
         Returns:
             Logger instance for the session
         """
-        logger_key = f"{user_id}_{session_id}"
+        logger_key = (user_id, session_id)
 
-        if logger_key in self._loggers:
-            return self._loggers[logger_key]
+        logger = self._loggers.get(logger_key)
+        if logger is not None:
+            self._loggers.move_to_end(logger_key)
+            return logger
 
         # Create user directory
         user_dir = self.base_dir / "users" / user_id
@@ -48,36 +159,29 @@ class UserStudyLogger:
         # Create session log file
         log_file = user_dir / f"{session_id}.log"
 
-        # Create logger
-        logger = logging.getLogger(f"user_study.{logger_key}")
-        logger.setLevel(logging.INFO)
+        # Create logger. It's only ever reached through self._loggers, so it isn't
+        # registered with logging.getLogger, which would keep it around forever.
+        logger = logging.Logger(f"user_study.{user_id}_{session_id}", logging.INFO)
 
-        # Remove any existing handlers to avoid duplicates
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
+        # Create file handler, opened on first write by the background thread
+        handler = _BatchedFileHandler(log_file, mode="a", encoding="utf-8", delay=True)
 
-        # Create file handler
-        handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+        handler.setFormatter(_SESSION_LOG_FORMATTER)
 
-        # Create human-readable formatter
-        formatter = logging.Formatter(
-            "[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        formatter.converter = utc8_converter  # Set to UTC+8
-        handler.setFormatter(formatter)
-
-        logger.addHandler(handler)
+        logger.addHandler(_SessionQueueHandler(self._queue, handler))
         logger.propagate = False  # Don't propagate to root logger
 
         self._loggers[logger_key] = logger
+        if len(self._loggers) > self.max_sessions:
+            self._drop_logger(self._loggers.popitem(last=False)[1])
         return logger
 
     def log_session_start(self, user_id: str, session_id: str):
         """Log the start of a conversation session."""
         logger = self._get_session_logger(user_id, session_id)
-        logger.info(f"=== SESSION START ===")
-        logger.info(f"User ID: {user_id}")
-        logger.info(f"Session ID: {session_id}")
+        logger.info("=== SESSION START ===")
+        logger.info("User ID: %s", user_id)
+        logger.info("Session ID: %s", session_id)
         logger.info("")
 
     def log_user_message(self, user_id: str, session_id: str, message: str):
@@ -85,7 +189,7 @@ class UserStudyLogger:
         logger = self._get_session_logger(user_id, session_id)
         # Clean up the message for readability
         clean_message = message.strip().replace("\n", " [NEWLINE] ")
-        logger.info(f"USER: {clean_message}")
+        logger.info("USER: %s", clean_message)
 
     def log_assistant_message(self, user_id: str, session_id: str, message: str):
         """Log an assistant message."""
@@ -96,49 +200,85 @@ class UserStudyLogger:
         if "<!-- session_info:" in clean_message:
             clean_message = clean_message.split("<!-- session_info:")[0].strip()
         clean_message = clean_message.replace("\n", " [NEWLINE] ")
-        logger.info(f"ASSISTANT: {clean_message}")
+        logger.info("ASSISTANT: %s", clean_message)
 
     def log_tool_call(self, user_id: str, session_id: str, tool_name: str, **kwargs):
         """Log when a tool is called by the agent."""
         logger = self._get_session_logger(user_id, session_id)
         args_str = ", ".join([f"{k}={v}" for k, v in kwargs.items() if v is not None])
-        logger.info(f"TOOL CALL: {tool_name}({args_str})")
+        logger.info("TOOL CALL: %s(%s)", tool_name, args_str)
 
     def log_skill_judgement(
         self, user_id: str, session_id: str, judgement: SkillJudgementFull
     ):
         """Log when a skill judgement is made and saved."""
         logger = self._get_session_logger(user_id, session_id)
-        logger.info(f"SKILL JUDGEMENT:")
-        logger.info(f"  Skill Type: {judgement.skill_type or 'None'}")
-        logger.info(f"  Score: {judgement.score}")
-        logger.info(f"  Confidence: {judgement.confidence}")
-        logger.info(f"  Reason: {judgement.reason}")
+        logger.info("SKILL JUDGEMENT:")
+        logger.info("  Skill Type: %s", judgement.skill_type or "None")
+        logger.info("  Score: %s", judgement.score)
+        logger.info("  Confidence: %s", judgement.confidence)
+        logger.info("  Reason: %s", judgement.reason)
         logger.info("")
 
     def log_error(self, user_id: str, session_id: str, error_msg: str):
         """Log an error that occurred during the conversation."""
         logger = self._get_session_logger(user_id, session_id)
-        logger.info(f"ERROR: {error_msg}")
+        logger.info("ERROR: %s", error_msg)
 
     def log_session_event(self, user_id: str, session_id: str, event: str):
         """Log a general session event."""
         logger = self._get_session_logger(user_id, session_id)
-        logger.info(f"EVENT: {event}")
+        logger.info("EVENT: %s", event)
+
 
+class NullUserStudyLogger:
+    """User study logger that logs nothing, used when logging is disabled.
+
+    Lets call sites log unconditionally instead of checking for None first. It has
+    the same public methods as UserStudyLogger, but shares no state with it.
+    """
+
+    def close(self):
+        """Do nothing."""
+
+    def log_session_start(self, user_id: str, session_id: str):
+        """Do nothing."""
+
+    def log_user_message(self, user_id: str, session_id: str, message: str):
+        """Do nothing."""
+
+    def log_assistant_message(self, user_id: str, session_id: str, message: str):
+        """Do nothing."""
+
+    def log_tool_call(self, user_id: str, session_id: str, tool_name: str, **kwargs):
+        """Do nothing."""
+
+    def log_skill_judgement(
+        self, user_id: str, session_id: str, judgement: SkillJudgementFull
+    ):
+        """Do nothing."""
+
+    def log_error(self, user_id: str, session_id: str, error_msg: str):
+        """Do nothing."""
+
+    def log_session_event(self, user_id: str, session_id: str, event: str):
+        """Do nothing."""
+
+
+_NULL_USER_STUDY_LOGGER = NullUserStudyLogger()
 
 # Global logger instance
-_user_study_logger: Optional[UserStudyLogger] = None
+_user_study_logger: UserStudyLogger | NullUserStudyLogger = _NULL_USER_STUDY_LOGGER
 
 
-def get_user_study_logger() -> Optional[UserStudyLogger]:
-    """Get the global user study logger instance."""
+def get_user_study_logger() -> UserStudyLogger | NullUserStudyLogger:
+    """Get the global user study logger instance, a no-op one if disabled."""
     return _user_study_logger
 
 
 def init_user_study_logger(
     enabled: bool = True, base_dir: str = "data"
-) -> Optional[UserStudyLogger]:
+) -> UserStudyLogger | NullUserStudyLogger:
     """Initialize the user study logger.
 
     Args:
@@ -146,13 +286,23 @@ def init_user_study_logger(
         base_dir: Base directory for logs
 
     Returns:
-        Logger instance if enabled, None otherwise
+        Logger instance if enabled, a NullUserStudyLogger otherwise
     """
     global _user_study_logger
 
+    _user_study_logger.close()
+
     if enabled:
         _user_study_logger = UserStudyLogger(base_dir)
     else:
-        _user_study_logger = None
+        _user_study_logger = _NULL_USER_STUDY_LOGGER
 
     return _user_study_logger
+
+
+def close_user_study_logger():
+    """Flush & close the global user study logger, disabling it."""
+    global _user_study_logger
+
+    _user_study_logger.close()
+    _user_study_logger = _NULL_USER_STUDY_LOGGER
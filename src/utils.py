@@ -1,7 +1,8 @@
 """Utility functions for the hikkinomore-buddy-server."""
 
+import asyncio
 import logging
-from typing import List, Optional
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set, Tuple
 
 from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse
 
@@ -9,6 +10,75 @@ from src.structs import ConversationMessage
 
 log = logging.getLogger(__name__)
 
+# Strong references to fire-and-forget tasks, else they may be garbage collected.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Background task failed.", exc_info=task.exception())
+
+
+def run_in_background(coro: Coroutine) -> asyncio.Task:
+    """Schedule a coroutine to run without awaiting it.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The scheduled task
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
+async def wait_background_tasks():
+    """Wait for all pending background tasks to finish, e.g. before shutdown."""
+    while _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+def _system_prompt_content(part: Any) -> Tuple[str, Optional[str]]:
+    return "system", getattr(part, "content", None)
+
+
+def _user_prompt_content(part: Any) -> Tuple[str, Optional[str]]:
+    raw_content = getattr(part, "content", None)
+
+    # Handle both string and sequence content
+    if isinstance(raw_content, str):
+        return "user", raw_content
+
+    if not raw_content:
+        return "user", None
+    # For multimodal content (a sequence of UserContent items), extract text parts
+    # only. Binary content, URLs, etc. are skipped for now, as they're not relevant
+    # for text-based skill evaluation.
+    text = " ".join(item for item in raw_content if isinstance(item, str))
+    return "user", text or None
+
+
+def _text_content(part: Any) -> Tuple[str, Optional[str]]:
+    # This is a text response from the model
+    return "assistant", getattr(part, "content", None)
+
+
+# part_kind -> function extracting the (role, content) of such a part.
+_PART_CONTENT_GETTERS: Dict[str, Callable[[Any], Tuple[str, Optional[str]]]] = {
+    "system-prompt": _system_prompt_content,
+    "user-prompt": _user_prompt_content,
+    "text": _text_content,
+}
+# Thinking parts are internal model reasoning, and tool parts aren't conversation.
+# TODO: lol tool parts are skipped either ways, maybe we can return a special message
+# type that is used to display what tools were called
+_SKIPPED_PART_KINDS = frozenset(
+    {"thinking", "tool-call", "tool-return", "retry-prompt"}
+)
+
 
 def convert_model_messages_to_conversation(
     message_history: List[ModelMessage],
@@ -43,71 +113,23 @@ def convert_model_messages_to_conversation(
         if not hasattr(msg, "parts") or not msg.parts:
             continue
 
-        # Determine the role based on the message type
-        if isinstance(msg, ModelRequest):
-            # This is a message from the user to the model
-            role = "user"  # Default for request messages
-        elif isinstance(msg, ModelResponse):
-            # This is a message from the model to the user
-            role = "assistant"
-        else:
+        if not isinstance(msg, (ModelRequest, ModelResponse)):
             # Fallback - shouldn't happen with current PydanticAI structure
             log.warning(f"Unknown message type: {type(msg)}")
             continue
 
         for part in msg.parts:
-            content = None
-            part_role = role  # Start with the message-level role
-
             # Extract content based on part type using part_kind discriminator
             part_kind = getattr(part, "part_kind", None)
-
-            if part_kind == "system-prompt":
-                if skip_system_messages:
-                    continue
-                part_role = "system"
-                content = getattr(part, "content", None)
-
-            elif part_kind == "user-prompt":
-                part_role = "user"
-                raw_content = getattr(part, "content", None)
-
-                # Handle both string and sequence content
-                if isinstance(raw_content, str):
-                    content = raw_content
-                else:
-                    # For multimodal content, extract text parts only
-                    # This is a sequence of UserContent items
-                    text_parts = []
-                    if raw_content and hasattr(raw_content, "__iter__"):
-                        for content_item in raw_content:
-                            if isinstance(content_item, str):
-                                text_parts.append(content_item)
-                            # Note: We're skipping binary content, URLs, etc. for now
-                            # as they're not relevant for text-based skill evaluation
-                    content = " ".join(text_parts) if text_parts else None
-
-            elif part_kind == "text":
-                # This is a text response from the model
-                part_role = "assistant"
-                content = getattr(part, "content", None)
-
-            elif part_kind == "thinking":
-                # Thinking parts are internal model reasoning - skip for skill evaluation
-                continue
-
-            elif part_kind in ("tool-call", "tool-return", "retry-prompt"):
-                # TODO: lol this is skipped either ways, maybe we can return a special message type
-                # that is used to display what tools were called
-                if skip_tool_messages:
-                    continue
-                # For tool messages, we could extract the content if needed
-                # but for skill evaluation, we typically skip these
+            if part_kind == "system-prompt" and skip_system_messages:
                 continue
 
-            else:
-                log.debug(f"Unhandled part kind: {part_kind}")
+            get_content = _PART_CONTENT_GETTERS.get(part_kind)
+            if get_content is None:
+                if part_kind not in _SKIPPED_PART_KINDS:
+                    log.debug(f"Unhandled part kind: {part_kind}")
                 continue
+            part_role, content = get_content(part)
 
             # Only add messages with actual content
             if content and content.strip():
@@ -122,6 +144,22 @@ def convert_model_messages_to_conversation(
     return conversation_messages
 
 
+def format_message(msg: ConversationMessage) -> str:
+    """Format a single conversation message for analysis.
+
+    Args:
+        msg: Conversation message to format
+
+    Returns:
+        Formatted message line
+    """
+    timestamp_str = ""
+    if ts := msg.timestamp:
+        # Same as strftime("%H:%M:%S"), without parsing the format each call.
+        timestamp_str = f" [{ts.hour:02d}:{ts.minute:02d}:{ts.second:02d}]"
+    return f"{msg.role.upper()}{timestamp_str}: {msg.content}"
+
+
 def format_conversation(messages: List[ConversationMessage]) -> str:
     """Format conversation messages for analysis.
 
@@ -131,11 +169,4 @@ def format_conversation(messages: List[ConversationMessage]) -> str:
     Returns:
         Formatted conversation text
     """
-    formatted = []
-    for msg in messages:
-        timestamp_str = ""
-        if msg.timestamp:
-            timestamp_str = f" [{msg.timestamp.strftime('%H:%M:%S')}]"
-        formatted.append(f"{msg.role.upper()}{timestamp_str}: {msg.content}")
-
-    return "\n".join(formatted)
+    return "\n".join(format_message(msg) for msg in messages)